@@ -1,10 +1,19 @@
 # app/main.py - UPDATED TO USE ACTUAL CSV DATA
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import polars as pl
+import altair as alt
 import numpy as np
 import os
+import sys
+from pathlib import Path
+
+# Make the repo root importable so the app shares src/ with the notebooks
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.data_utils import COLUMN_MAPPING, USECOLS, load_country_frame
+
+COUNTRIES = ["Benin", "Sierra Leone", "Togo"]
 
 # Page configuration
 st.set_page_config(
@@ -23,8 +32,8 @@ st.sidebar.header("Dashboard Controls")
 # Country selection
 selected_countries = st.sidebar.multiselect(
     "Select Countries:",
-    ["Benin", "Sierra Leone", "Togo"],
-    default=["Benin", "Sierra Leone", "Togo"]
+    COUNTRIES,
+    default=COUNTRIES
 )
 
 # Metric selection
@@ -33,71 +42,45 @@ metric = st.sidebar.selectbox(
     ["GHI", "DNI", "DHI", "Tamb", "WS", "RH"]
 )
 
-# Data loading function
-@st.cache_data
-def load_country_data(country_name):
-    """Load data for a specific country - tries processed first, then raw"""
-    try:
-        # First try processed/cleaned data
-        processed_files = {
-            "Benin": "data/processed/benin_clean.csv",
-            "Sierra Leone": "data/processed/sierra_leone_clean.csv", 
-            "Togo": "data/processed/togo_clean.csv"
-        }
-        
-        # Then try raw data files
-        raw_files = {
-            "Benin": "data/raw/benin-malanville.csv",
-            "Sierra Leone": "data/raw/sierraleone-bumbuna.csv",
-            "Togo": "data/raw/togo-dapaong_qc.csv"
-        }
-        
-        # Try processed data first
-        processed_file = processed_files.get(country_name)
-        if processed_file and os.path.exists(processed_file):
-            df = pd.read_csv(processed_file)
-            df['country'] = country_name
-            st.sidebar.success(f"✓ Loaded processed data for {country_name}")
-            return df
-        
-        # Fall back to raw data
-        raw_file = raw_files.get(country_name)
-        if raw_file and os.path.exists(raw_file):
-            df = pd.read_csv(raw_file)
-            df['country'] = country_name
-            st.sidebar.info(f"📁 Loaded raw data for {country_name}")
-            return df
-        
-        st.sidebar.warning(f"⚠ No data file found for {country_name}")
-        return None
-        
-    except Exception as e:
-        st.sidebar.error(f"❌ Error loading {country_name}: {str(e)}")
-        return None
-
-@st.cache_data
+# Data loading - the actual file resolution, Parquet cache and Polars parse
+# live in src.data_utils.load_country_frame, shared with the notebooks.
+# cache_resource shares the loaded frame across sessions without the
+# pickle round-trip st.cache_data does on every hit; nothing mutates the
+# frame after it is built, so sharing it read-only is safe
+@st.cache_resource(show_spinner=False)
 def load_all_data():
     """Load all country data"""
-    countries_data = []
+    country_frames = []
     loaded_countries = []
     data_sources = []
-    
-    for country in ["Benin", "Sierra Leone", "Togo"]:
-        country_data = load_country_data(country)
-        if country_data is not None:
-            # Standardize column names if needed
-            country_data = standardize_columns(country_data)
-            countries_data.append(country_data)
+
+    for country in COUNTRIES:
+        try:
+            frame, source = load_country_frame(country)
+        except Exception as e:
+            st.sidebar.error(f"❌ Error loading {country}: {str(e)}")
+            continue
+        if frame is not None:
+            country_frames.append(frame)
             loaded_countries.append(country)
-            
-            # Track data source
-            if "clean" in str(country_data.attrs.get('source', '')):
-                data_sources.append("processed")
-            else:
-                data_sources.append("raw")
-    
-    if countries_data:
-        combined_data = pd.concat(countries_data, ignore_index=True)
+            data_sources.append(source)
+
+    if country_frames:
+        # Concatenate on the Arrow buffers and convert to pandas only once.
+        # Casting country to categorical here means pandas never sees a
+        # full-length object column for it
+        combined_data = (
+            pl.concat(country_frames, how="diagonal")
+            .with_columns(pl.col("country").cast(pl.Categorical))
+            .to_pandas()
+        )
+        # Fixed category set so isin/groupby run on int8 codes regardless
+        # of which files were found
+        combined_data['country'] = combined_data['country'].astype(
+            pd.CategoricalDtype(categories=COUNTRIES)
+        )
+        # Standardize column names if needed
+        combined_data = standardize_columns(combined_data)
         source_info = " + ".join([f"{country} ({src})" for country, src in zip(loaded_countries, data_sources)])
         st.sidebar.success(f"✅ Loaded: {source_info}")
         return combined_data
@@ -108,51 +91,35 @@ def load_all_data():
 
 def standardize_columns(df):
     """Standardize column names across different datasets"""
-    column_mapping = {
-        # Temperature columns
-        'T_ModA': 'ModA', 'TModA': 'ModA', 'Module_A_Temp': 'ModA',
-        'T_ModB': 'ModB', 'TModB': 'ModB', 'Module_B_Temp': 'ModB',
-        'T_Amb': 'Tamb', 'T_amb': 'Tamb', 'Ambient_Temp': 'Tamb',
-        
-        # Wind columns
-        'WS': 'WS', 'Wind_Speed': 'WS',
-        'WSgust': 'WSgust', 'Gust_Speed': 'WSgust',
-        'WD': 'WD', 'Wind_Direction': 'WD',
-        
-        # Solar columns
-        'GHI': 'GHI', 'Global_Irradiance': 'GHI',
-        'DNI': 'DNI', 'Direct_Irradiance': 'DNI', 
-        'DHI': 'DHI', 'Diffuse_Irradiance': 'DHI',
-        
-        # Other environmental
-        'RH': 'RH', 'Relative_Humidity': 'RH',
-        'BP': 'BP', 'Barometric_Pressure': 'BP'
+    # A single rename swaps the axis labels without copying any column data,
+    # where the old per-column assignment materialized a copy per alias
+    to_rename = {
+        old_col: new_col for old_col, new_col in COLUMN_MAPPING.items()
+        if old_col in df.columns and new_col not in df.columns and old_col != new_col
     }
-    
-    # Rename columns if they exist in mapping
-    for old_col, new_col in column_mapping.items():
-        if old_col in df.columns and new_col not in df.columns:
-            df[new_col] = df[old_col]
-    
-    return df
+    return df.rename(columns=to_rename)
 
+# Cached so reruns keep the same random frame - the memoized aggregate
+# helpers are keyed on (countries, metric) and assume data is stable
+@st.cache_data
 def create_sample_data():
     """Create minimal sample data as last resort"""
     st.sidebar.warning("🔄 Using sample data for demonstration")
+    # Typical GHI/DNI/DHI/Tamb/WS/RH levels; one standard_normal draw per
+    # country replaces six separate np.random.normal calls
+    means = np.array([500, 400, 150, 28, 3, 65], dtype=np.float32)
+    stds = np.array([100, 80, 40, 5, 1.5, 15], dtype=np.float32)
+    rng = np.random.default_rng()
     sample_data = []
-    for country in ["Benin", "Sierra Leone", "Togo"]:
+    for country in COUNTRIES:
         n_samples = 200
-        sample_df = pd.DataFrame({
-            'GHI': np.random.normal(500, 100, n_samples),
-            'DNI': np.random.normal(400, 80, n_samples),
-            'DHI': np.random.normal(150, 40, n_samples),
-            'Tamb': np.random.normal(28, 5, n_samples),
-            'WS': np.random.normal(3, 1.5, n_samples),
-            'RH': np.random.normal(65, 15, n_samples),
-            'country': country
-        })
+        values = rng.standard_normal((n_samples, len(USECOLS)), dtype=np.float32) * stds + means
+        sample_df = pd.DataFrame(values, columns=USECOLS)
+        sample_df['country'] = country
         sample_data.append(sample_df)
-    return pd.concat(sample_data, ignore_index=True)
+    combined = pd.concat(sample_data, ignore_index=True)
+    combined['country'] = combined['country'].astype('category')
+    return combined
 
 # Load the data
 data = load_all_data()
@@ -161,6 +128,55 @@ data = load_all_data()
 if data is None:
     data = create_sample_data()
 
+@st.cache_data
+def get_agg(countries, metric):
+    """Per-country summary statistics, memoized per (countries, metric)"""
+    subset = data.loc[data['country'].isin(countries), ['country', metric]]
+    return subset.groupby('country', observed=True, sort=False)[metric].agg(['mean', 'median', 'std', 'count']).round(2)
+
+@st.cache_data
+def styled_stats_html(countries, metric):
+    """Blues-gradient stats table rendered to HTML, memoized per selection"""
+    return get_agg(countries, metric).style.background_gradient(cmap='Blues').to_html()
+
+@st.cache_data
+def get_hist(countries, metric, bins=30):
+    """Shared bin edges and per-country histogram counts, memoized per selection"""
+    subset = data.loc[data['country'].isin(countries), ['country', metric]]
+    lo = float(subset[metric].min())
+    hi = float(subset[metric].max())
+    edges = np.linspace(lo, hi, bins + 1)
+    scale = bins / (hi - lo) if hi > lo else 0.0
+    # One groupby instead of a full boolean-mask scan per country: with the
+    # categorical country column, get_group is O(group size) not O(N)
+    grouped = subset.groupby('country', observed=True, sort=False)[metric]
+    counts = {}
+    for country in countries:
+        if country not in grouped.groups:
+            continue
+        vals = grouped.get_group(country).to_numpy(dtype=np.float32, copy=False)
+        vals = vals[~np.isnan(vals)]
+        if len(vals) > 0:
+            idx = ((vals - lo) * scale).astype(np.int32)
+            np.clip(idx, 0, bins - 1, out=idx)
+            counts[country] = np.bincount(idx, minlength=bins)
+    return edges, counts
+
+@st.cache_data
+def box_stats(countries, metric):
+    """Five-number summaries per country, precomputed for ax.bxp"""
+    subset = data.loc[data['country'].isin(countries), ['country', metric]]
+    quantiles = (
+        subset.groupby('country', observed=True)[metric]
+        .quantile([0.0, 0.25, 0.5, 0.75, 1.0])
+        .unstack()
+    )
+    return [
+        {'label': country, 'whislo': row[0.0], 'q1': row[0.25],
+         'med': row[0.5], 'q3': row[0.75], 'whishi': row[1.0]}
+        for country, row in quantiles.iterrows()
+    ]
+
 # Display data info
 st.sidebar.markdown("---")
 st.sidebar.markdown(f"**Total Records:** {len(data):,}")
@@ -175,23 +191,36 @@ if data is not None and not data.empty:
     if filtered_data.empty:
         st.warning("No data available for selected countries")
     else:
+        # One cached aggregation shared by the stats table, the ranking chart
+        # and the insights section; revisiting a selection is a cache hit
+        if metric in filtered_data.columns:
+            metric_agg = get_agg(tuple(sorted(selected_countries)), metric)
+        else:
+            metric_agg = None
+
         # Create two columns for layout
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader(f"{metric} Distribution")
             
-            # Boxplot
-            fig, ax = plt.subplots(figsize=(10, 6))
+            # Boxplot rendered client-side from cached five-number summaries -
+            # only the tiny stats frame crosses the websocket, not the data
             if metric in filtered_data.columns:
-                sns.boxplot(data=filtered_data, x='country', y=metric, ax=ax)
-                ax.set_title(f'{metric} Distribution by Country')
-                ax.set_ylabel(f'{metric} (W/m²)' if metric in ['GHI', 'DNI', 'DHI'] else 
-                             f'{metric} (°C)' if metric == 'Tamb' else
-                             f'{metric} (m/s)' if metric == 'WS' else
-                             f'{metric} (%)' if metric == 'RH' else metric)
-                plt.xticks(rotation=45)
-                st.pyplot(fig)
+                y_title = (f'{metric} (W/m²)' if metric in ['GHI', 'DNI', 'DHI'] else
+                           f'{metric} (°C)' if metric == 'Tamb' else
+                           f'{metric} (m/s)' if metric == 'WS' else
+                           f'{metric} (%)' if metric == 'RH' else metric)
+                box_df = pd.DataFrame(box_stats(tuple(sorted(selected_countries)), metric))
+                base = alt.Chart(box_df).encode(x=alt.X('label:N', title='Country'))
+                whiskers = base.mark_rule().encode(
+                    y=alt.Y('whislo:Q', title=y_title), y2='whishi:Q')
+                boxes = base.mark_bar(size=30).encode(
+                    y='q1:Q', y2='q3:Q', color=alt.Color('label:N', legend=None))
+                medians = base.mark_tick(color='white', size=30).encode(y='med:Q')
+                box_chart = (whiskers + boxes + medians).properties(
+                    title=f'{metric} Distribution by Country', height=400)
+                st.altair_chart(box_chart, use_container_width=True)
             else:
                 st.warning(f"Metric '{metric}' not found in data")
         
@@ -199,9 +228,12 @@ if data is not None and not data.empty:
             st.subheader("Country Comparison")
             
             # Summary statistics table
-            if metric in filtered_data.columns:
-                stats_table = filtered_data.groupby('country')[metric].agg(['mean', 'median', 'std', 'count']).round(2)
-                st.dataframe(stats_table.style.background_gradient(cmap='Blues'))
+            if metric_agg is not None:
+                stats_table = metric_agg
+                # The styler's per-cell colour mapping runs in pure Python, so
+                # render it once per selection and reuse the HTML
+                st.markdown(styled_stats_html(tuple(sorted(selected_countries)), metric),
+                            unsafe_allow_html=True)
                 
                 # Data quality indicator
                 total_records = stats_table['count'].sum()
@@ -218,40 +250,44 @@ if data is not None and not data.empty:
             col3, col4 = st.columns(2)
             
             with col3:
-                # Histogram comparison
+                # Histogram comparison - counts computed with np.bincount on
+                # shared uniform bins, which skips Matplotlib's slow hist path
                 st.markdown("**Distribution Comparison**")
-                fig, ax = plt.subplots(figsize=(10, 6))
                 colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
-                for i, country in enumerate(selected_countries):
-                    country_data = filtered_data[filtered_data['country'] == country][metric].dropna()
-                    if len(country_data) > 0:
-                        ax.hist(country_data, alpha=0.7, label=country, 
-                               bins=30, color=colors[i % len(colors)])
-                ax.set_xlabel(metric)
-                ax.set_ylabel('Frequency')
-                ax.legend()
-                ax.set_title(f'{metric} Distribution by Country')
-                st.pyplot(fig)
+                edges, hist_counts = get_hist(tuple(sorted(selected_countries)), metric)
+                hist_rows = [
+                    {'bin_start': float(edges[j]), 'bin_end': float(edges[j + 1]),
+                     'count': int(count), 'country': country}
+                    for country, counts in hist_counts.items()
+                    for j, count in enumerate(counts)
+                ]
+                hist_chart = alt.Chart(pd.DataFrame(hist_rows)).mark_bar(opacity=0.7).encode(
+                    x=alt.X('bin_start:Q', bin='binned', title=metric),
+                    x2='bin_end:Q',
+                    y=alt.Y('count:Q', title='Frequency', stack=None),
+                    color=alt.Color('country:N', scale=alt.Scale(range=colors))
+                ).properties(title=f'{metric} Distribution by Country', height=400)
+                st.altair_chart(hist_chart, use_container_width=True)
             
             with col4:
                 # Ranking chart
                 st.markdown("**Country Ranking**")
-                ranking_data = filtered_data.groupby('country')[metric].mean().sort_values(ascending=True)
+                ranking_data = metric_agg['mean'].sort_values(ascending=True)
                 if len(ranking_data) > 0:
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1'][:len(ranking_data)]
-                    bars = ax.barh(range(len(ranking_data)), ranking_data.values, color=colors)
-                    ax.set_yticks(range(len(ranking_data)))
-                    ax.set_yticklabels(ranking_data.index)
-                    ax.set_xlabel(f'Average {metric}')
-                    ax.set_title(f'Country Ranking by {metric}')
-                    
+                    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+                    ranking_df = ranking_data.reset_index()
+                    ranking_df.columns = ['country', 'mean']
+                    bars = alt.Chart(ranking_df).mark_bar().encode(
+                        x=alt.X('mean:Q', title=f'Average {metric}'),
+                        y=alt.Y('country:N', sort='x', title=None),
+                        color=alt.Color('country:N', scale=alt.Scale(range=colors), legend=None)
+                    )
                     # Add value labels on bars
-                    for i, (bar, value) in enumerate(zip(bars, ranking_data.values)):
-                        ax.text(value + (ranking_data.max() * 0.01), i, 
-                               f'{value:.1f}', va='center', fontweight='bold')
-                    
-                    st.pyplot(fig)
+                    labels = bars.mark_text(align='left', dx=3, fontWeight='bold').encode(
+                        text=alt.Text('mean:Q', format='.1f'))
+                    rank_chart = (bars + labels).properties(
+                        title=f'Country Ranking by {metric}', height=400)
+                    st.altair_chart(rank_chart, use_container_width=True)
                 else:
                     st.warning("No data available for ranking")
             
@@ -260,7 +296,7 @@ if data is not None and not data.empty:
             
             # Calculate insights dynamically
             if len(selected_countries) > 0:
-                country_stats = filtered_data.groupby('country')[metric].agg(['mean', 'std', 'count']).round(2)
+                country_stats = metric_agg
                 if len(country_stats) > 0:
                     best_country = country_stats['mean'].idxmax()
                     best_value = country_stats['mean'].max()
@@ -309,9 +345,18 @@ data_files = {
     'Togo (Processed)': 'data/processed/togo_clean.csv'
 }
 
-for file_desc, filepath in data_files.items():
-    if os.path.exists(filepath):
-        file_size = os.path.getsize(filepath) / 1024  # Size in KB
-        st.sidebar.success(f"✓ {file_desc} ({file_size:.1f} KB)")
+# Poll the filesystem at most once a minute instead of six stat calls
+# on every rerun
+@st.cache_data(ttl=60)
+def file_status():
+    """File existence and sizes for the status sidebar"""
+    return {
+        desc: (os.path.exists(path), os.path.getsize(path) if os.path.exists(path) else 0)
+        for desc, path in data_files.items()
+    }
+
+for file_desc, (file_exists, file_size) in file_status().items():
+    if file_exists:
+        st.sidebar.success(f"✓ {file_desc} ({file_size / 1024:.1f} KB)")
     else:
         st.sidebar.error(f"✗ {file_desc}")
\ No newline at end of file
@@ -1,22 +1,18 @@
 # app/utils.py
-import pandas as pd
-import numpy as np
+import sys
+from pathlib import Path
+
+# Make the repo root importable so the app shares src/ with the notebooks
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.data_utils import load_country_data
 
-def load_country_data(country_name):
-    """Load cleaned data for a specific country"""
-    try:
-        df = pd.read_csv(f'data/processed/{country_name.lower()}_clean.csv')
-        df['country'] = country_name
-        return df
-    except FileNotFoundError:
-        print(f"Data for {country_name} not found")
-        return None
 
 def calculate_statistics(df, metric):
     """Calculate summary statistics for a given metric"""
     if metric not in df.columns:
         return None
-    
+
     return {
         'mean': df[metric].mean(),
         'median': df[metric].median(),
@@ -30,9 +26,9 @@ def generate_insights(df, metric):
     stats = calculate_statistics(df, metric)
     if not stats:
         return "No data available"
-    
+
     return f"""
     Average {metric}: {stats['mean']:.2f}
     Variability (std): {stats['std']:.2f}
     Range: {stats['min']:.2f} - {stats['max']:.2f}
-    """
\ No newline at end of file
+    """
@@ -1,28 +1,196 @@
 # src/data_utils.py
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import numpy as np
-from scipy import stats
+import csv
+from functools import lru_cache
+from pathlib import Path
 
-def load_country_data(filepath):
-    """Load country solar data"""
-    df = pd.read_csv(filepath)
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Read the numeric metrics as float32 and keep the timestamp as a string
+FLOAT_COLUMNS = ["GHI", "DNI", "DHI", "Tamb", "WS", "RH"]
+SCHEMA_OVERRIDES = {col: pl.Float32 for col in FLOAT_COLUMNS}
+SCHEMA_OVERRIDES["Timestamp"] = pl.Utf8
+
+ARROW_COLUMN_TYPES = {col: pa.float32() for col in FLOAT_COLUMNS}
+ARROW_COLUMN_TYPES["Timestamp"] = pa.string()
+
+# The dashboard and notebooks only ever analyse these metrics, so everything
+# else can be dropped at parse time
+USECOLS = list(FLOAT_COLUMNS)
+
+# Aliases seen across the different station exports, applied by the
+# dashboard's standardize_columns after load
+COLUMN_MAPPING = {
+    # Temperature columns
+    'T_ModA': 'ModA', 'TModA': 'ModA', 'Module_A_Temp': 'ModA',
+    'T_ModB': 'ModB', 'TModB': 'ModB', 'Module_B_Temp': 'ModB',
+    'T_Amb': 'Tamb', 'T_amb': 'Tamb', 'Ambient_Temp': 'Tamb',
+
+    # Wind columns
+    'WS': 'WS', 'Wind_Speed': 'WS',
+    'WSgust': 'WSgust', 'Gust_Speed': 'WSgust',
+    'WD': 'WD', 'Wind_Direction': 'WD',
+
+    # Solar columns
+    'GHI': 'GHI', 'Global_Irradiance': 'GHI',
+    'DNI': 'DNI', 'Direct_Irradiance': 'DNI',
+    'DHI': 'DHI', 'Diffuse_Irradiance': 'DHI',
+
+    # Other environmental
+    'RH': 'RH', 'Relative_Humidity': 'RH',
+    'BP': 'BP', 'Barometric_Pressure': 'BP'
+}
+
+# Per-country files relative to the data root, processed preferred over raw
+PROCESSED_FILES = {
+    "Benin": "processed/benin_clean.csv",
+    "Sierra Leone": "processed/sierra_leone_clean.csv",
+    "Togo": "processed/togo_clean.csv"
+}
+
+RAW_FILES = {
+    "Benin": "raw/benin-malanville.csv",
+    "Sierra Leone": "raw/sierraleone-bumbuna.csv",
+    "Togo": "raw/togo-dapaong_qc.csv"
+}
+
+def load_country_frame(country_name, root="data"):
+    """Read one country's data as a Polars frame - tries processed first, then raw.
+
+    Returns a (frame, source) tuple where source is 'processed' or 'raw',
+    or (None, None) if no file exists for the country.
+    """
+    root = Path(root)
+    processed_file = PROCESSED_FILES.get(country_name)
+    raw_file = RAW_FILES.get(country_name)
+    if processed_file and (root / processed_file).exists():
+        filepath, source = root / processed_file, "processed"
+    elif raw_file and (root / raw_file).exists():
+        filepath, source = root / raw_file, "raw"
+    else:
+        return None, None
+
+    # Write-through Parquet cache: CSV parsing dominates load time, so each
+    # file is converted once and reread as columnar Parquet until the CSV changes
+    cache = root / "cache" / f"{country_name.lower().replace(' ', '_')}.parquet"
+    if cache.exists() and cache.stat().st_mtime >= filepath.stat().st_mtime:
+        frame = pl.read_parquet(cache)
+        frame = frame.select([c for c in frame.columns if c in USECOLS or c in COLUMN_MAPPING])
+    else:
+        # Polars parses with a multi-threaded CSV reader and Arrow-backed
+        # columns; scanning lazily pushes the column projection into the
+        # parser, so unused columns are never materialized at all
+        lazy = pl.scan_csv(filepath, schema_overrides=SCHEMA_OVERRIDES, low_memory=False)
+        keep = [c for c in lazy.collect_schema().names() if c in USECOLS or c in COLUMN_MAPPING]
+        frame = lazy.select(keep).collect()
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        frame.write_parquet(cache, compression="snappy")
+    # Standardize alias headers per frame, before any concat: a diagonal
+    # concat of frames with mixed aliases would otherwise create both the
+    # alias and the canonical column, NaN-filled, and block the rename
+    to_rename = {
+        old_col: new_col for old_col, new_col in COLUMN_MAPPING.items()
+        if old_col in frame.columns and new_col not in frame.columns and old_col != new_col
+    }
+    if to_rename:
+        frame = frame.rename(to_rename)
+    # Aliased columns miss the SCHEMA_OVERRIDES entry and get type-inferred,
+    # so cast the canonical metrics to Float32 after the rename - otherwise
+    # pl.concat over frames from mixed headers raises a SchemaError. This
+    # also repairs stale-typed Parquet cache reads
+    frame = frame.with_columns(
+        [pl.col(c).cast(pl.Float32) for c in FLOAT_COLUMNS if c in frame.columns]
+    )
+    frame = frame.with_columns(pl.lit(country_name).alias("country"))
+    return frame, source
+
+@lru_cache(maxsize=None)
+def load_country_data(country_name, root="data"):
+    """Load one country's data as pandas, cached per (country, root)"""
+    frame, source = load_country_frame(country_name, root)
+    if frame is None:
+        print(f"Data for {country_name} not found")
+        return None
+    df = frame.to_pandas()
+    df.attrs['source'] = source
+    print(f"Loaded data: {df.shape}")
+    return df
+
+def load_csv(filepath, columns=None):
+    """Load an arbitrary solar CSV, optionally projecting to a subset of columns"""
+    if columns is not None:
+        # Intersect with the file's actual header so requested columns that
+        # are absent get skipped instead of materialized as all-NaN phantoms
+        with open(filepath, newline="") as f:
+            header = next(csv.reader(f))
+        columns = [c for c in columns if c in header]
+    # Memory-map the file so the OS pages it in on demand, and let Arrow's
+    # multi-threaded reader parse 4MB blocks in parallel; to_pandas is then
+    # zero-copy for the numeric columns
+    with pa.memory_map(str(filepath), "r") as source:
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=4 * 1024 * 1024),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=ARROW_COLUMN_TYPES,
+                include_columns=columns,
+            ),
+        )
+    df = table.to_pandas()
     print(f"Loaded data: {df.shape}")
     return df
 
 def detect_outliers_zscore(df, columns, threshold=3):
     """Detect outliers using Z-score method"""
-    outliers = {}
-    for col in columns:
-        if col in df.columns:
-            z_scores = np.abs(stats.zscore(df[col].dropna()))
-            outliers[col] = (z_scores > threshold).sum()
-    return outliers
+    columns = [col for col in columns if col in df.columns]
+    if not columns:
+        return {}
+    # One vectorized pass over the whole numeric submatrix instead of a
+    # scipy.stats.zscore call (and its allocations) per column
+    arr = df[columns].to_numpy(dtype=np.float32, copy=False)
+    mu = np.nanmean(arr, axis=0)
+    sd = np.nanstd(arr, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.abs((arr - mu) / sd)
+    counts = (z > threshold).sum(axis=0)
+    return dict(zip(columns, counts.tolist()))
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _count_nans(arr):
+        n, c = arr.shape
+        out = np.zeros(c, np.int64)
+        for j in prange(c):
+            s = 0
+            for i in range(n):
+                if np.isnan(arr[i, j]):
+                    s += 1
+            out[j] = s
+        return out
 
 def generate_missing_report(df):
     """Generate missing value report"""
-    missing_count = df.isna().sum()
+    float_cols = df.select_dtypes(include="floating").columns
+    if njit is not None and len(float_cols) > 0:
+        # Count NaNs in one parallel pass over the float buffer instead of
+        # materializing the full N x C boolean matrix that df.isna() builds
+        counts = _count_nans(df[float_cols].to_numpy(copy=False))
+        missing_count = pd.Series(counts, index=float_cols)
+        other_cols = df.columns.difference(float_cols, sort=False)
+        if len(other_cols) > 0:
+            missing_count = pd.concat([missing_count, df[other_cols].isna().sum()])
+        missing_count = missing_count.reindex(df.columns)
+    else:
+        missing_count = df.isna().sum()
     missing_percent = (missing_count / len(df)) * 100
     return pd.DataFrame({
         'missing_count': missing_count,
         'missing_percent': missing_percent
-    })
\ No newline at end of file
+    })